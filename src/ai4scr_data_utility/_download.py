@@ -0,0 +1,178 @@
+"""Downloading files with progress bar"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+# downloads smaller than this are not split into concurrent range requests
+_MULTIPART_MIN_SIZE = 32 * 1024 * 1024
+
+
+def download_with_progress(fpath: Path, url: str, *, nparts: int = 1, blocksize: int = 4 * 1024 * 1024) -> None:
+    """downloads url to fpath and shows a progress bar
+
+    file:// urls are copied in the kernel. Large files on servers that support range requests are downloaded with
+    nparts concurrent requests, everything else is streamed over a single connection.
+
+    Args:
+        fpath: path to which the file is downloaded
+        url: URL from which the file is downloaded
+        nparts: maximal number of concurrent range requests, 1 disables multi-part downloads
+        blocksize: size of the buffer the response is read into
+    """
+    from tqdm import tqdm
+    from urllib.request import urlopen, Request
+
+    # download next to the target and move it into place once complete, so that an interrupted download never
+    # leaves a truncated file at fpath
+    part = fpath.with_name(fpath.name + '.part')
+    try:
+        if url.startswith('file://') and hasattr(os, 'copy_file_range'):
+            _copy_local_file(url, part)
+            sync_replace(part, fpath)
+            return
+
+        size = _ranged_download_size(url) if nparts > 1 else None
+        if size is not None:
+            try:
+                _download_ranges(part, url, size, nparts, blocksize)
+                sync_replace(part, fpath)
+                return
+            except _RangeNotSupportedError:
+                pass
+
+        with urlopen(Request(url, headers={"User-agent": "dataset-user"})) as rsp:
+            total = rsp.info().get("content-length", None)
+            with tqdm(
+                    unit="B",
+                    unit_scale=True,
+                    miniters=1,
+                    unit_divisor=1024,
+                    total=total if total is None else int(total)
+            ) as t, part.open('wb') as f:
+                view = memoryview(bytearray(blocksize))
+                n = rsp.readinto(view)
+                while n:
+                    f.write(view[:n])
+                    t.update(n)
+                    n = rsp.readinto(view)
+        sync_replace(part, fpath)
+    except (KeyboardInterrupt, Exception):
+        # Make sure file doesn’t exist half-downloaded
+        if part.is_file():
+            part.unlink()
+        raise
+
+
+def sync_replace(src: Path, dst: Path) -> None:
+    """flushes src to disk and atomically moves it to dst, readers either see the old or the complete new file"""
+    with open(src, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(src, dst)
+
+
+class _RangeNotSupportedError(Exception):
+    """raised if the server ignores a range request"""
+
+
+def _ranged_download_size(url: str) -> Optional[int]:
+    """returns the size of the file at url if it is large enough for and supports a multi-part download"""
+    from urllib.error import HTTPError
+    from urllib.request import urlopen, Request
+
+    try:
+        with urlopen(Request(url, method='HEAD', headers={"User-agent": "dataset-user"})) as rsp:
+            info = rsp.info()
+    except HTTPError:
+        return None
+
+    size = info.get('content-length', None)
+    if info.get('accept-ranges', '') != 'bytes' or size is None or int(size) < _MULTIPART_MIN_SIZE:
+        return None
+    return int(size)
+
+
+def _download_ranges(fpath: Path, url: str, size: int, nparts: int, blocksize: int) -> None:
+    """downloads url into fpath with nparts concurrent range requests that read straight into a memory-mapped file"""
+    import mmap
+    import threading
+    from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+    from tqdm import tqdm
+
+    step = -(-size // nparts)
+    lock = threading.Lock()
+    cancel = threading.Event()
+    with tqdm(unit="B", unit_scale=True, miniters=1, unit_divisor=1024, total=size) as t, fpath.open('wb+') as f:
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except (AttributeError, OSError):
+            f.truncate(size)
+
+        def progress(n):
+            with lock:
+                t.update(n)
+
+        with mmap.mmap(f.fileno(), size) as mm:
+            with memoryview(mm) as view, ThreadPoolExecutor(max_workers=nparts) as executor:
+                futures = [executor.submit(_fetch_range, url, start, min(start + step, size) - 1, view, blocksize,
+                                           progress, cancel)
+                           for start in range(0, size, step)]
+                try:
+                    done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                    for future in done:
+                        future.result()
+                except BaseException:
+                    # on a failed range or Ctrl-C the other ranges stop after their current block instead of
+                    # downloading to the end while the executor waits for them
+                    cancel.set()
+                    for future in futures:
+                        future.cancel()
+                    raise
+            mm.flush()
+
+
+def _fetch_range(url: str, start: int, end: int, view: memoryview, blocksize: int, progress, cancel) -> None:
+    """reads the bytes start to end (inclusive) of url into the same offsets of view, stops early once cancel is set"""
+    from urllib.request import urlopen, Request
+
+    if cancel.is_set():
+        return
+    headers = {"User-agent": "dataset-user", "Range": f"bytes={start}-{end}"}
+    with urlopen(Request(url, headers=headers)) as rsp:
+        if rsp.status != 206 or not rsp.headers.get('content-range', '').startswith(f'bytes {start}-{end}/'):
+            raise _RangeNotSupportedError(f'{url} did not respond with the requested range')
+        offset = start
+        while offset <= end:
+            if cancel.is_set():
+                return
+            n = rsp.readinto(view[offset:min(offset + blocksize, end + 1)])
+            if not n:
+                break
+            offset += n
+            progress(n)
+
+    if offset != end + 1:
+        raise IOError(f'Incomplete download of bytes {start}-{end} from {url}')
+
+
+def _copy_local_file(url: str, fpath: Path) -> None:
+    """copies a file:// url to fpath in the kernel with os.copy_file_range, falling back to a buffered copy"""
+    import shutil
+    from urllib.parse import urlparse
+    from urllib.request import url2pathname
+
+    src_fd = os.open(url2pathname(urlparse(url).path), os.O_RDONLY)
+    try:
+        with fpath.open('wb') as f:
+            try:
+                while os.copy_file_range(src_fd, f.fileno(), 1 << 24):
+                    pass
+            except OSError:
+                # e.g. unsupported by the filesystem, restart with a plain copy
+                os.lseek(src_fd, 0, os.SEEK_SET)
+                f.seek(0)
+                f.truncate()
+                with os.fdopen(src_fd, 'rb', closefd=False) as src:
+                    shutil.copyfileobj(src, f, 1024 * 1024)
+    finally:
+        os.close(src_fd)
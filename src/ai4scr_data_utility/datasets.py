@@ -1,9 +1,387 @@
 """Base class implementation and MixIns"""
 
-import pickle
+import contextlib
+import hashlib
+import io
+import json
+import mmap
+import os
+import stat
+import struct
+import sys
+import threading
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Union, Optional
+from collections import OrderedDict
+from typing import Union, Optional, Any
+
+from ._download import download_with_progress, sync_replace
+
+_ARROW_MAGIC = b'ARROW1'
+_NUMPY_MAGIC = b'\x93NUMPY'
+_ZIP_MAGIC = b'PK\x03\x04'
+_PICKLE_OOB_MAGIC = b'AI4SCRPB'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+# buffer size for writing cache files, coalesces the many small chunks of a serialized object into few syscalls
+_IO_BUFFER_SIZE = 4 * 1024 * 1024
+# memory-mapped cache files larger than this are read ahead by the kernel in the background right after mapping
+_READAHEAD_MIN_SIZE = 10 * 1024 * 1024
+# parameters of np.savez that cannot be used as array names
+_NPZ_RESERVED_KEYS = frozenset({'file', 'args', 'allow_pickle'})
+# out-of-band pickle buffers start at multiples of this offset so that arrays loaded from them are aligned
+_PICKLE_OOB_ALIGN = 64
+
+# in-memory LRU of loaded datasets shared by all AI4SCRDataset instances, see AI4SCRDataset.memory_cache_size
+_DATA_MEMO: 'OrderedDict[tuple, Any]' = OrderedDict()
+_DATA_MEMO_LOCK = threading.Lock()
+
+
+class _StatCache(threading.local):
+    stats: Optional[dict] = None
+
+
+# stat results are only remembered while a dataset is constructed, see _stat_cache
+_STAT_CACHE = _StatCache()
+
+
+@contextlib.contextmanager
+def _stat_cache():
+    """remembers the results of :func:`_cached_stat` within the block
+
+    Files changed by others are noticed again once the block is left. Nested blocks share the cache of the outermost
+    one.
+    """
+    if _STAT_CACHE.stats is not None:
+        yield
+        return
+    _STAT_CACHE.stats = {}
+    try:
+        yield
+    finally:
+        _STAT_CACHE.stats = None
+
+
+def _forget_stats() -> None:
+    """drops the remembered stat results, call after writing files"""
+    if _STAT_CACHE.stats is not None:
+        _STAT_CACHE.stats.clear()
+
+
+def _cached_stat(path: str) -> Optional[os.stat_result]:
+    """stats path, or returns the remembered result inside a :func:`_stat_cache` block"""
+    stats = _STAT_CACHE.stats
+    if stats is not None and path in stats:
+        return stats[path]
+    try:
+        result = os.stat(path)
+    except FileNotFoundError:
+        result = None
+    if stats is not None:
+        stats[path] = result
+    return result
+
+
+def _is_file(path: Union[str, Path]) -> bool:
+    st = _cached_stat(str(path))
+    return st is not None and stat.S_ISREG(st.st_mode)
+
+
+def _is_dir(path: Union[str, Path]) -> bool:
+    st = _cached_stat(str(path))
+    return st is not None and stat.S_ISDIR(st.st_mode)
+
+
+def _ensure_dir(path: Path) -> Path:
+    """creates path and its parents if they do not exist yet, costs a single mkdir call if it does"""
+    try:
+        path.mkdir(parents=True)
+    except FileExistsError:
+        pass
+    else:
+        _forget_stats()
+    return path
+
+
+def _is_plain_array(np, data) -> bool:
+    # subclasses such as masked arrays or matrices would be loaded back as plain arrays
+    return type(data) is np.ndarray and not data.dtype.hasobject
+
+
+def _is_npz_key(key) -> bool:
+    # keys are passed as keyword arguments to np.savez and must not collide with its own parameters
+    return isinstance(key, str) and key.isidentifier() and key not in _NPZ_RESERVED_KEYS
+
+
+def _is_feather_frame(pd, data) -> bool:
+    """whether data is a DataFrame that round-trips through feather unchanged
+
+    Columns need unique string names, object columns may only hold strings and missing values. Other Python objects
+    (e.g. lists or sets) would come back converted, as would subclasses of DataFrame.
+    """
+    if type(data) is not pd.DataFrame or not data.columns.is_unique:
+        return False
+    if not all(isinstance(c, str) for c in data.columns):
+        return False
+    return all(pd.api.types.infer_dtype(data.iloc[:, i], skipna=True) in ('string', 'empty')
+               for i, dtype in enumerate(data.dtypes) if dtype == object)
+
+
+def _serialize(data, use_pickle: bool = False, compression: Optional[str] = None) -> list:
+    """serializes data in a format suited to its type
+
+    DataFrames are written as feather if they round-trip unchanged, numpy arrays as ``.npy`` and dicts of numpy arrays
+    as ``.npz``. Everything else is pickled with its large buffers stored out-of-band, see :func:`_dumps_out_of_band`.
+    numpy and pandas are only considered if they have already been imported by the caller.
+
+    Args:
+        data: data that should be serialized
+        use_pickle: whether to pickle the data regardless of its type
+        compression: None or ``'zstd'``, feather compresses the columns of DataFrames itself
+
+    Returns:
+        list of bytes-like chunks that make up the file content
+    """
+    pd = sys.modules.get('pandas')
+    np = sys.modules.get('numpy')
+
+    if use_pickle:
+        pass
+    elif pd is not None and _is_feather_frame(pd, data):
+        try:
+            import pyarrow as pa
+            from pyarrow import feather
+        except ImportError:
+            pass
+        else:
+            sink = pa.BufferOutputStream()
+            try:
+                feather.write_feather(data, sink, compression=compression or 'uncompressed')
+            except (pa.ArrowException, ValueError, TypeError):
+                # types arrow cannot convert are pickled instead
+                pass
+            else:
+                return [sink.getvalue()]
+    elif np is not None and _is_plain_array(np, data):
+        buf = io.BytesIO()
+        np.save(buf, data, allow_pickle=False)
+        return [buf.getbuffer()]
+    elif (np is not None and type(data) is dict and data
+          and all(_is_npz_key(k) and _is_plain_array(np, v) for k, v in data.items())):
+        buf = io.BytesIO()
+        np.savez(buf, **data)
+        return [buf.getbuffer()]
+
+    import pickle
+    if use_pickle:
+        return [pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)]
+    return _dumps_out_of_band(data)
+
+
+def _dumps_out_of_band(data) -> list:
+    """pickles data with protocol 5 and stores large buffers (e.g. numpy arrays) out-of-band
+
+    The buffers are returned as zero-copy views and laid out after the pickle stream, each aligned to
+    ``_PICKLE_OOB_ALIGN`` bytes::
+
+        magic | pickle length | number of buffers | buffer lengths | pickle | buffer 0 | buffer 1 | ...
+
+    Data without out-of-band buffers is returned as a plain pickle.
+    """
+    import pickle
+
+    buffers = []
+    payload = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+    if not buffers:
+        return [payload]
+
+    raws = [b.raw() for b in buffers]
+    chunks = [_PICKLE_OOB_MAGIC + struct.pack(f'<QQ{len(raws)}Q', len(payload), len(raws), *(r.nbytes for r in raws)),
+              payload]
+    offset = len(chunks[0]) + len(payload)
+    for raw in raws:
+        padding = -offset % _PICKLE_OOB_ALIGN
+        chunks += [bytes(padding), raw]
+        offset += padding + raw.nbytes
+    return chunks
+
+
+def _loads_out_of_band(buffer):
+    """unpickles the output of :func:`_dumps_out_of_band`, out-of-band buffers reference buffer without a copy"""
+    import pickle
+
+    view = memoryview(buffer)
+    payload_size, n = struct.unpack_from('<QQ', view, len(_PICKLE_OOB_MAGIC))
+    offset = len(_PICKLE_OOB_MAGIC) + 16
+    sizes = struct.unpack_from(f'<{n}Q', view, offset)
+    offset += 8 * n
+    payload = view[offset:offset + payload_size]
+    offset += payload_size
+
+    buffers = []
+    for size in sizes:
+        offset += -offset % _PICKLE_OOB_ALIGN
+        buffers.append(view[offset:offset + size])
+        offset += size
+    return pickle.loads(payload, buffers=buffers)
+
+
+def _zstd_compress(chunks):
+    """compresses chunks into a single zstd frame, yielding the compressed chunks as they become available"""
+    import zstandard
+
+    # the content size goes into the frame header so that readers can allocate the output once
+    size = sum(memoryview(chunk).nbytes for chunk in chunks)
+    compressor = zstandard.ZstdCompressor(level=3, threads=-1).compressobj(size=size)
+    for chunk in chunks:
+        yield compressor.compress(chunk)
+    yield compressor.flush()
+
+
+def _digest_path(path: Path) -> Path:
+    return path.with_name(path.name + '.blake2b')
+
+
+def _discard_digest(path: Path) -> None:
+    """removes the sidecar of :func:`_write_if_changed`, call when path is written by other means"""
+    try:
+        _digest_path(path).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _write_if_changed(path: Path, chunks: list, compression: Optional[str] = None) -> bool:
+    """writes chunks to path unless the file already holds the same content
+
+    The digest of the uncompressed content is kept in a ``.blake2b`` sidecar file next to path, together with the size
+    and mtime of the written file. Unchanged files are neither compressed nor rewritten and do not get their mtime
+    bumped. Files whose size or mtime no longer match the sidecar are rewritten. Both files are replaced atomically.
+
+    Args:
+        path: file to which the chunks are written
+        chunks: bytes-like objects that make up the file content
+        compression: None or ``'zstd'`` to compress the content
+
+    Returns:
+        whether the file was written
+    """
+    h = hashlib.blake2b(digest_size=16, person=(compression or '').encode())
+    for chunk in chunks:
+        h.update(chunk)
+    digest = h.hexdigest()
+
+    sidecar = _digest_path(path)
+    st = _cached_stat(str(path))
+    if st is not None and stat.S_ISREG(st.st_mode) and _is_file(sidecar):
+        with open(sidecar, 'rb') as f:
+            if f.read() == _digest_stamp(digest, st):
+                return False
+
+    # drop the digest first so that an interrupted write is never mistaken for unchanged content
+    _discard_digest(path)
+    # feather files are compressed column by column in _serialize, they stay readable without decompressing them first
+    compressed = bytes(memoryview(chunks[0])[:len(_ARROW_MAGIC)]) == _ARROW_MAGIC
+    content = _zstd_compress(chunks) if compression == 'zstd' and not compressed else chunks
+    _replace_file(path, content)
+    _replace_file(sidecar, [_digest_stamp(digest, os.stat(path))])
+    return True
+
+
+def _digest_stamp(digest: str, st: os.stat_result) -> bytes:
+    # size and mtime of the data file tie the digest to it, a file replaced or edited by other means does not match
+    return f'{digest} {st.st_size} {st.st_mtime_ns}'.encode()
+
+
+def _replace_file(path: Path, chunks) -> None:
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb', buffering=_IO_BUFFER_SIZE) as f:
+        for chunk in chunks:
+            f.write(chunk)
+    sync_replace(tmp, path)
+
+
+def _deserialize(path: Path):
+    """reads data written by :func:`_serialize`
+
+    The format is detected from the leading magic bytes of the file. Uncompressed arrays are memory-mapped
+    copy-on-write, so slicing them only reads the touched pages from disk. Pickles and feather files are parsed from a
+    memory map of the file. zstd compressed files are decompressed into memory.
+
+    Args:
+        path: file from which the data is read
+
+    Returns:
+        the loaded data
+    """
+    # unbuffered, sniffing the format must not read ahead into files that are memory-mapped below
+    with open(path, 'rb', buffering=0) as f:
+        magic = f.read(len(_PICKLE_OOB_MAGIC))
+        if magic.startswith(_ZSTD_MAGIC):
+            import zstandard
+            _advise_sequential(f)
+            f.seek(0)
+            size = zstandard.get_frame_parameters(f.read(18)).content_size  # 18: maximal frame header size
+            f.seek(0)
+            if size == zstandard.CONTENTSIZE_UNKNOWN:
+                buf = io.BytesIO()
+                zstandard.ZstdDecompressor().copy_stream(f, buf)
+                return _loads(buf.getbuffer())
+            buf = memoryview(bytearray(size))
+            with zstandard.ZstdDecompressor().stream_reader(f, closefd=False) as reader:
+                offset = 0
+                while offset < size:
+                    n = reader.readinto(buf[offset:])
+                    if not n:
+                        raise EOFError(f'{path} is truncated')
+                    offset += n
+            return _loads(buf)
+        if magic == _PICKLE_OOB_MAGIC:
+            # private mapping: the arrays are backed by the page cache and stay writable without touching the file
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            if len(mm) >= _READAHEAD_MIN_SIZE and hasattr(mmap, 'MADV_WILLNEED'):
+                mm.madvise(mmap.MADV_WILLNEED)
+            return _loads_out_of_band(mm)
+        if not magic.startswith((_ARROW_MAGIC, _NUMPY_MAGIC, _ZIP_MAGIC)):
+            import pickle
+            # unpickle straight from the page cache instead of copying the file through read calls
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return pickle.loads(mm)
+
+    if magic.startswith(_ARROW_MAGIC):
+        from pyarrow import feather
+        return feather.read_feather(str(path), memory_map=True)
+
+    import numpy as np
+    if magic.startswith(_NUMPY_MAGIC):
+        return np.load(path, mmap_mode='c', allow_pickle=False)
+    with np.load(path, allow_pickle=False) as npz:
+        return dict(npz)
+
+
+def _advise_sequential(f) -> None:
+    """tells the kernel that f is read sequentially, which enlarges its readahead window"""
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+
+def _loads(buffer: memoryview):
+    """like :func:`_deserialize` but reads from an in-memory buffer"""
+    magic = bytes(buffer[:len(_PICKLE_OOB_MAGIC)])
+    if magic == _PICKLE_OOB_MAGIC:
+        return _loads_out_of_band(buffer)
+    if not magic.startswith((_ARROW_MAGIC, _NUMPY_MAGIC, _ZIP_MAGIC)):
+        import pickle
+        return pickle.loads(buffer)
+
+    if magic.startswith(_ARROW_MAGIC):
+        import pyarrow as pa
+        from pyarrow import feather
+        return feather.read_feather(pa.BufferReader(buffer))
+
+    import numpy as np
+    if magic.startswith(_NUMPY_MAGIC):
+        return np.load(io.BytesIO(buffer), allow_pickle=False)
+    with np.load(io.BytesIO(buffer), allow_pickle=False) as npz:
+        return dict(npz)
 
 
 class CacheMixIn:
@@ -12,18 +390,44 @@ class CacheMixIn:
     Provides functionalities for caching processed data. Caching requires to set the `cache_path` attribute. Use the
     following functions to work with cached versions of your data:
 
+    Uncompressed files of the ``'file'`` backend are memory-mapped on load. numpy arrays and the large buffers of
+    pickled objects are backed by the page cache, so processes loading the same cache (e.g. DataLoader workers) share
+    one copy of the data in RAM instead of unpickling their own.
+
     Attributes:
         cache_root: path to caching root
+        use_pickle: whether to always write plain pickles instead of choosing a format based on the type of the data
+        cache_backend: ``'file'`` stores every cached object in its own file in :attr:`cache_root`, ``'joblib'`` does
+            the same with :func:`joblib.dump` and memory-maps numpy arrays on load (requires the `joblib` package),
+            ``'diskcache'`` stores them in a :class:`diskcache.Cache` in :attr:`cache_root` (requires the `diskcache`
+            package)
+        cache_size_limit: size limit in bytes of the ``'diskcache'`` backend, least recently used entries are evicted
+            first
+        compression: None or ``'zstd'`` to compress the files of the ``'file'`` backend (requires the `zstandard`
+            package). Saves disk space and IO for compressible data at the cost of CPU time and memory-mapped loading.
+            DataFrames are stored as feather files with zstd compressed columns.
 
     """
     cache_root: Union[str, Path] = None
+    use_pickle = False
+    cache_backend = 'file'
+    cache_size_limit = 32 * 1024 ** 3
+    compression = None
 
     def __init__(self, **kwargs):
         self.cache_root = Path(self.cache_root)
+        if self.cache_backend == 'diskcache':
+            import diskcache
+            self._cache = diskcache.Cache(str(self.cache_root), size_limit=self.cache_size_limit,
+                                          eviction_policy='least-recently-used')
+        elif self.cache_backend not in ('file', 'joblib'):
+            raise ValueError(f'Unknown cache backend {self.cache_backend}. Use one of file, joblib, diskcache.')
+        if self.compression not in (None, 'zstd'):
+            raise ValueError(f'Unknown compression {self.compression}. Use one of None, zstd.')
         super().__init__(**kwargs)
 
     def load_cache(self, fname):
-        """loads pickled data from cache
+        """loads data from cache
 
         Args:
             fname: file name to which the data is saved
@@ -31,22 +435,42 @@ class CacheMixIn:
         Returns:
             the loaded data
         """
-        with open(self.cache_root / fname, 'rb') as f:
-            data = pickle.load(f)
-        return data
+        if self.cache_backend == 'diskcache':
+            return self._cache[fname]
+        if self.cache_backend == 'joblib':
+            import joblib
+            return joblib.load(self.cache_root / fname, mmap_mode='c')
+        return _deserialize(self.cache_root / fname)
 
     def save_cache(self, data, fname) -> None:
         """
 
         Args:
             data: data that should be saved
-            fname: saves pickled data to cache
+            fname: saves data to cache
 
         Returns:
             None
         """
-        with open(self.cache_root / fname, 'wb') as f:
-            pickle.dump(data, f)
+        if self.cache_backend == 'diskcache':
+            # a file written by the 'file' backend no longer holds the latest data
+            _discard_digest(self.cache_root / fname)
+            self._cache.set(fname, data, expire=None)
+            return
+        try:
+            if self.cache_backend == 'joblib':
+                import joblib
+                path = _ensure_dir(self.cache_root) / fname
+                # the digest of the 'file' backend would describe the replaced content
+                _discard_digest(path)
+                tmp = path.with_name(path.name + '.tmp')
+                joblib.dump(data, tmp, compress=0)
+                sync_replace(tmp, path)
+            else:
+                _write_if_changed(_ensure_dir(self.cache_root) / fname,
+                                  _serialize(data, self.use_pickle, self.compression), self.compression)
+        finally:
+            _forget_stats()
 
     def has_cache(self, fname) -> bool:
         """checks whether a cached file exits
@@ -57,7 +481,9 @@ class CacheMixIn:
         Returns:
 
         """
-        return (self.cache_root / fname).is_file()
+        if self.cache_backend == 'diskcache':
+            return fname in self._cache
+        return _is_file(self.cache_root / fname)
 
     def get_cache_path(self, fname) -> Path:
         """return cache path
@@ -78,12 +504,15 @@ class DownloadMixIn:
         url: URL from which the data can be downloaded
         path: path to which the downloaded file should be save to
         force_download: whether to force re-downloading the file if it already exists
+        download_parts: number of concurrent range requests used for large files if the server supports them,
+            1 disables multi-part downloads
 
     """
 
     url = None
     path = None
     force_download = False
+    download_parts = 8
 
     def __init__(self, **kwargs):
         """Download the file.
@@ -92,51 +521,30 @@ class DownloadMixIn:
         """
         super().__init__(**kwargs)
 
-        if self.force_download or not self.path.is_file():
+        if self.force_download or not _is_file(self.path):
             self.download()
 
     def download(self):
         """Download raw dataset form url"""
-        if self.path.parent.is_dir():
-            self._download_progress(self.path, self.url)
+        if _is_dir(os.path.dirname(os.fspath(self.path)) or os.curdir):
+            try:
+                download_with_progress(self.path, self.url, nparts=self.download_parts)
+            finally:
+                _forget_stats()
         else:
             raise ValueError(f'{self.path.parent} is not a valid path to a directory')
 
-    @staticmethod
-    def _download_progress(fpath: Path, url):
-        from tqdm import tqdm
-        from urllib.request import urlopen, Request
-        blocksize = 1024 * 8
-        blocknum = 0
-
-        try:
-            with urlopen(Request(url, headers={"User-agent": "dataset-user"})) as rsp:
-                total = rsp.info().get("content-length", None)
-                with tqdm(
-                        unit="B",
-                        unit_scale=True,
-                        miniters=1,
-                        unit_divisor=1024,
-                        total=total if total is None else int(total)
-                ) as t, fpath.open('wb') as f:
-                    block = rsp.read(blocksize)
-                    while block:
-                        f.write(block)
-                        blocknum += 1
-                        t.update(len(block))
-                        block = rsp.read(blocksize)
-        except (KeyboardInterrupt, Exception):
-            # Make sure file doesn’t exist half-downloaded
-            if fpath.is_file():
-                fpath.unlink()
-            raise
-
 
 class RecipeMixIn:
     """Recipe MixIn provides functionalities to create differently processed versions of the raw data
 
+    Every subclass has its own registry of recipes with the ones registered in its class body or on the subclass, and
+    the ones registered in the class bodies of bases that are not RecipeMixIn classes. Recipes are looked up along the
+    MRO, so a subclass sees the recipes of its parents, including ones registered after it was defined. Recipes
+    registered on :class:`RecipeMixIn` outside a class body are visible to all subclasses.
+
     Attributes:
-        recipes: Dict of recipes registered with the :meth:`register_recipe` decorator
+        recipes: Dict of recipes registered on this class with the :meth:`register_recipe` decorator
         recipe: the recipe to use for loading the data
         force_process: whether to force re-processing of the raw data
 
@@ -145,16 +553,73 @@ class RecipeMixIn:
     recipe = None
     force_process = False
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        recipes = dict(vars(cls).get('recipes', {}))
+        # bases that are not RecipeMixIn classes have no registry of their own, their recipes are collected here
+        for klass in reversed(cls.__mro__):
+            if klass is not cls and issubclass(klass, RecipeMixIn):
+                continue
+            for attr in vars(klass).values():
+                func = getattr(attr, '__func__', attr)  # unwrap staticmethods
+                for name in getattr(func, '_recipe_names', ()):
+                    recipes[name] = func
+        cls.recipes = recipes
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self._recipe_fn = (self.recipe, self._resolve_recipe_fn()) if self.recipe is not None else (None, None)
+
+    @classmethod
+    def find_recipe(cls, name):
+        """returns the recipe registered under name on cls or its parents, None if there is none"""
+        for klass in cls.__mro__:
+            recipes = vars(klass).get('recipes')
+            if recipes and name in recipes:
+                return recipes[name]
+        return None
 
     def get_recipe_fn(self):
-        return self.recipes[self.recipe]
+        """returns the function registered for :attr:`recipe`
+
+        Raises:
+            KeyError: if no recipe with this name is registered
+            TypeError: if the registered recipe is not callable
+        """
+        recipe, func = getattr(self, '_recipe_fn', (None, None))
+        if recipe != self.recipe or func is None:
+            func = self._resolve_recipe_fn()
+            self._recipe_fn = (self.recipe, func)
+        return func
+
+    def _resolve_recipe_fn(self):
+        func = self.find_recipe(self.recipe)
+        if func is None:
+            raise KeyError(f'No recipe {self.recipe} registered. Use the RecipeMixIn.register_recipe() decorator to '
+                           f'register functions as recipes.')
+        if not callable(func):
+            raise TypeError(f'Recipe {self.recipe} is not callable but of type {type(func)}.')
+        return func
 
     @classmethod
     def register_recipe(cls, name):
+        """registers the decorated function as recipe
+
+        Used in a class body (``@RecipeMixIn.register_recipe(name)``) the recipe is registered on the class that is
+        being defined. Called on a subclass it is registered on that subclass, called on :class:`RecipeMixIn` outside a
+        class body it is registered for all subclasses. A function can be registered under several names.
+
+        Args:
+            name: name of the recipe
+        """
         def register_named_recipe(recipe):
-            cls.recipes[name] = recipe
+            func = getattr(recipe, '__func__', recipe)  # unwrap staticmethods
+            func._recipe_names = [*getattr(func, '_recipe_names', ()), name]
+            # functions defined in a class body are collected by __init_subclass__ once the class exists
+            qualname = getattr(func, '__qualname__', '').split('.')
+            in_class_body = len(qualname) > 1 and qualname[-2] != '<locals>'
+            if cls is not RecipeMixIn or not in_class_body:
+                cls.recipes[name] = recipe
             return recipe
 
         return register_named_recipe
@@ -173,12 +638,16 @@ class BaseDataset(ABC):
     path = None
 
     def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.setup()
+        with _stat_cache():
+            super().__init__(**kwargs)
+            self.setup()
 
     @abstractmethod
     def __getitem__(self, index):
-        """return samples at index"""
+        """return samples at index
+
+        index is a single position or, to fetch a batch in one call, a slice or an array-like of positions.
+        """
         pass
 
     @abstractmethod
@@ -203,11 +672,17 @@ class AI4SCRDataset(BaseDataset, DownloadMixIn, CacheMixIn, RecipeMixIn):
         url: URL from which the data can be downloaded
         module: module / project to which the dataset belongs to. Dataset will be cached in a child folder of the cache_root with module name
         cache_root: path to caching root
+        memory_cache_size: number of loaded datasets kept in memory across instances, 0 (the default) disables the
+            in-memory cache. Instances constructed with the same class, path, recipe and recipe_kwargs share the same
+            data object, i.e. in-place modifications are visible to all of them. recipe_kwargs that are not JSON
+            serializable are never cached. Cached datasets stay in memory until they are evicted or
+            :meth:`clear_memory_cache` is called.
     """
 
     url = None
     module = None
     cache_root = Path('~/.ai4scr/datasets').expanduser()
+    memory_cache_size = 0
 
     def __init__(self,
                  path: Optional[Union[Path, str]] = None,
@@ -225,34 +700,37 @@ class AI4SCRDataset(BaseDataset, DownloadMixIn, CacheMixIn, RecipeMixIn):
             force_process: whether to force re-processing of the raw data
         """
 
-        if recipe is not None and recipe not in self.recipes:
+        if recipe is not None and self.find_recipe(recipe) is None:
             raise KeyError(f'No recipe {recipe} registert. Use the RecipeMixIn.register_recipe() decorator to register '
                            f'functions as recipes.')
 
         self.recipe = recipe
         self.recipe_kwargs = recipe_kwargs if recipe_kwargs else {}
 
-        # modify cache_root and create directory hierarchy
+        # modify cache_root, the directory is created once something is written to it
         self.cache_root = self.cache_root / self.module
-        self.cache_root.mkdir(parents=True, exist_ok=True)
 
         # set dataset name to classname
         self.dataset_name = self.__class__.__name__
 
-        # adjust path of raw data file to the cache location if not given
-        if path:
-            if not self.path.is_file():
-                raise FileNotFoundError(f'File {self.path} does not exist.')
-            self.path = path
-        else:
-            self.path = self.get_cache_path(self.dataset_name + '_raw')
-
-        self.force_download = force_download
-        self.force_process = force_process
-
-        # initialise empty data
-        self.data = None
-        super().__init__()
+        # stat results are shared by the checks below, the mixins and setup
+        with _stat_cache():
+            # adjust path of raw data file to the cache location if not given
+            if path:
+                if not _is_file(os.fspath(path)):
+                    raise FileNotFoundError(f'File {path} does not exist.')
+                self.path = Path(path)
+            else:
+                # the raw data is downloaded into the cache
+                _ensure_dir(self.cache_root)
+                self.path = self.get_cache_path(self.dataset_name + '_raw')
+
+            self.force_download = force_download
+            self.force_process = force_process
+
+            # initialise empty data
+            self.data = None
+            super().__init__()
 
     @abstractmethod
     def process_raw_data(self):
@@ -265,7 +743,10 @@ class AI4SCRDataset(BaseDataset, DownloadMixIn, CacheMixIn, RecipeMixIn):
 
     @abstractmethod
     def __getitem__(self, index):
-        """return samples at index"""
+        """return samples at index
+
+        index is a single position or, to fetch a batch in one call, a slice or an array-like of positions.
+        """
         pass
 
     @abstractmethod
@@ -275,7 +756,7 @@ class AI4SCRDataset(BaseDataset, DownloadMixIn, CacheMixIn, RecipeMixIn):
 
     def load_raw_data(self):
         fname = self.dataset_name
-        if self.force_download or self.force_process or not self.get_cache_path(fname).is_file():
+        if self.force_download or self.force_process or not self.has_cache(fname):
             if self.force_download:
                 self.download()
 
@@ -286,21 +767,58 @@ class AI4SCRDataset(BaseDataset, DownloadMixIn, CacheMixIn, RecipeMixIn):
         return data
 
     def load_recipe_data(self):
+        # resolve the recipe first to fail before loading or downloading the raw data
+        recipe_fn = self.get_recipe_fn()
         fname = self.get_recipe_filename(self.recipe)
         if self.force_process or not self.has_cache(fname):
             data = self.load_raw_data()
-            data = self.get_recipe_fn()(data, **self.recipe_kwargs)
+            data = recipe_fn(data, **self.recipe_kwargs)
             self.save_cache(data, fname)
         else:
             data = self.load_cache(fname)
         return data
 
     def setup(self):
+        # a setup() outside of __init__ also stats the raw file and the caches only once
+        with _stat_cache():
+            self._setup()
+
+    def _setup(self):
+        key = self._memory_cache_key() if self.memory_cache_size > 0 else None
+        if key is not None and not (self.force_download or self.force_process):
+            with _DATA_MEMO_LOCK:
+                if key in _DATA_MEMO:
+                    _DATA_MEMO.move_to_end(key)
+                    self.data = _DATA_MEMO[key]
+                    return
+
         if self.recipe:
             data = self.load_recipe_data()
         else:
             data = self.load_raw_data()
         self.data = data
 
+        if key is not None:
+            with _DATA_MEMO_LOCK:
+                _DATA_MEMO[key] = data
+                _DATA_MEMO.move_to_end(key)
+                while len(_DATA_MEMO) > self.memory_cache_size:
+                    _DATA_MEMO.popitem(last=False)
+
+    def _memory_cache_key(self) -> Optional[tuple]:
+        try:
+            kwargs = json.dumps(self.recipe_kwargs, sort_keys=True)
+        except (TypeError, ValueError):
+            # e.g. arrays or other objects whose str() is not unique, such keys could collide
+            return None
+        return type(self), self.dataset_name, str(self.path), self.recipe, kwargs
+
+    @classmethod
+    def clear_memory_cache(cls) -> None:
+        """drops the in-memory cached data of this class and its subclasses"""
+        with _DATA_MEMO_LOCK:
+            for key in [k for k in _DATA_MEMO if issubclass(k[0], cls)]:
+                del _DATA_MEMO[key]
+
     def get_recipe_filename(self, recipe):
         return f'{self.dataset_name}_{recipe}.pkl'
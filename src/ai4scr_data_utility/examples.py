@@ -1,63 +1,180 @@
 """Examples demonstrating how to use the base class and mixins to create custom dataset classes"""
 
+import io
+import numbers
+import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from .datasets import AI4SCRDataset, BaseDataset, DownloadMixIn, RecipeMixIn, CacheMixIn
 
 
-class SimpleInMemoryDataset(BaseDataset):
+def _read_csv(path, **kwargs):
+    try:
+        # arrow parses the file in parallel blocks
+        return pd.read_csv(path, engine='pyarrow', **kwargs)
+    except ImportError:
+        return pd.read_csv(path, **kwargs)
+
+
+class _RowsMixIn:
+    """serves the rows of the DataFrame in :attr:`data` from a contiguous numpy array
+
+    The array is built on first access and rebuilt when :attr:`data` is replaced by another object. Call
+    :meth:`invalidate` after modifying :attr:`data` in place.
+    """
+    data = None
+    _values = None
+
+    @property
+    def values(self):
+        """rows of data as a contiguous numpy array"""
+        if self._values is None or self._values[0] is not self.data:
+            self._values = (self.data, np.ascontiguousarray(self.data.to_numpy()))
+        return self._values[1]
+
+    def invalidate(self):
+        """drops the array built from data, it is rebuilt from the current data on next access"""
+        self._values = None
+
+    def rows(self, index):
+        """returns the rows at index
+
+        A single position returns the row as Series, so ``row['age']`` and ``row.age`` keep working. Slices and
+        array-likes of positions return the batch as one array.
+        """
+        if isinstance(index, numbers.Integral):
+            return self.data.iloc[index]
+        return self.values[index]
+
+
+class SimpleInMemoryDataset(_RowsMixIn, BaseDataset):
     path = Path('~/tmp/test.csv').expanduser()
     data = None
 
     def __getitem__(self, index):
-        return self.data.iloc[index]
+        return self.rows(index)
 
     def __len__(self):
         return len(self.data)
 
     def setup(self):
-        self.data = pd.read_csv(self.path)
+        self.data = _read_csv(self.path)
+
+
+def _read_lines(path):
+    with open(path, 'r') as f:
+        return f.readlines()
+
+
+def _decode_lines(data: bytes):
+    # decode the way open(path, 'r') does
+    with io.TextIOWrapper(io.BytesIO(data)) as f:
+        return f.readlines()
 
 
 class SimpleDiskDataset(BaseDataset):
     path = Path('~/tmp/bs345.tar.gz').expanduser()
     files = None
+    # threads reading the files of a batch concurrently, pays off where reads block on slow (e.g. network) storage.
+    # 0 reads serially, which is faster for small files on local disks or in the page cache
+    read_workers = 0
+    parallel_read_min = 32  # smaller batches are always read serially
+    max_open_files = 256  # files kept open between reads, well below the common limit of 1024 descriptors
+    _fds = None
+    _executor = None
 
     def __getitem__(self, index):
-        data = []
-        for i in index:
-            f = self.files[i]
-            with open(f, 'r') as f:
-                data.append(f.readlines())
-        return data
+        # normalized to non-negative positions, which also key the open files
+        positions = range(len(self.files))
+        if isinstance(index, numbers.Integral):
+            return self._read_item(positions[index])
+        index = positions[index] if isinstance(index, slice) else [positions[i] for i in index]
+        if self.read_workers < 1 or len(index) < self.parallel_read_min:
+            return [self._read_item(i) for i in index]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.read_workers)
+        return list(self._executor.map(self._read_item, index))
 
     def __len__(self):
         return len(self.files)
 
     def setup(self):
-        import tarfile
-
-        with tarfile.open(self.path, 'r:gz') as tar:
-            tar.extractall(self.path.parent)
-            p = self.path.parent / 'bs345'
-            self.files = list(p.glob('*.txt'))
-
-
-class SimpleDownloadDS(BaseDataset, DownloadMixIn):
+        if shutil.which('tar') and shutil.which('pigz'):
+            # tar unpacks the members in C while pigz decompresses in a separate process
+            subprocess.run(['tar', '--use-compress-program=pigz', '-xf', str(self.path), '-C', str(self.path.parent)],
+                           check=True)
+        else:
+            import tarfile
+
+            with tarfile.open(self.path, 'r:gz') as tar:
+                tar.extractall(self.path.parent)
+        p = self.path.parent / 'bs345'
+        self.files = list(p.glob('*.txt'))
+
+        # recently read files stay open, reading them again is a single pread instead of open, read and close
+        self.close()
+        self._lock = threading.Lock()
+        self._fds = OrderedDict()  # index -> (descriptor, size), least recently read first
+
+    def _read_item(self, i):
+        if not hasattr(os, 'pread'):
+            return _read_lines(self.files[i])
+
+        # the descriptor is taken out of the LRU while it is read, so that other threads cannot close it
+        with self._lock:
+            entry = self._fds.pop(i, None)
+        if entry is None:
+            fd = os.open(self.files[i], os.O_RDONLY)
+            entry = (fd, os.fstat(fd).st_size)
+        try:
+            return _decode_lines(os.pread(entry[0], entry[1], 0))
+        finally:
+            with self._lock:
+                if i in self._fds:
+                    # another thread opened the same file meanwhile
+                    os.close(entry[0])
+                else:
+                    self._fds[i] = entry
+                while len(self._fds) > self.max_open_files:
+                    os.close(self._fds.popitem(last=False)[1][0])
+
+    def close(self):
+        """closes the files kept open between reads and stops the reader threads"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._fds is None:
+            return
+        with self._lock:
+            fds, self._fds = self._fds, OrderedDict()
+        for fd, _ in fds.values():
+            os.close(fd)
+
+    def __del__(self):
+        self.close()
+
+
+class SimpleDownloadDS(_RowsMixIn, BaseDataset, DownloadMixIn):
     path = Path('~/tmp/test.csv').expanduser()  # location where the file is downloaded to
     url = 'https://raw.github.ibm.com/AI4SCR-DEV/dataset/master/test.csv?token=AACPXJWSHH5GNYJZO4WANW3C7235G'
     data = None
 
     def __getitem__(self, index):
-        return self.data.iloc[index]
+        return self.rows(index)
 
     def __len__(self):
         return len(self.data)
 
     def setup(self):
-        self.data = pd.read_csv(self.path)
+        self.data = _read_csv(self.path)
 
 
 class SimpleDownloadDatasetSubclass(SimpleInMemoryDataset, DownloadMixIn):
@@ -90,6 +207,8 @@ class SimpleRecipe(SimpleInMemoryDataset, RecipeMixIn):
         super().setup()
         if self.recipe:
             self.data = self.get_recipe_fn()(self.data)
+            # recipes may modify data in place
+            self.invalidate()
 
     @staticmethod
     @RecipeMixIn.register_recipe('default')
@@ -98,18 +217,18 @@ class SimpleRecipe(SimpleInMemoryDataset, RecipeMixIn):
         return data
 
 
-class DB(AI4SCRDataset):
+class DB(_RowsMixIn, AI4SCRDataset):
     url = 'http://ml-flow.tracking.zc2.ibm.com:8000/data.csv'
     module = 'drug-interaction'
 
     def __getitem__(self, index):
-        return self.data.iloc[index]
+        return self.rows(index)
 
     def __len__(self):
         return len(self.data)
 
     def process_raw_data(self):
-        return pd.read_table(self.path, sep=';')
+        return _read_csv(self.path, sep=';')
 
     @staticmethod
     @RecipeMixIn.register_recipe('default')
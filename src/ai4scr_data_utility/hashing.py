@@ -1,17 +1,69 @@
+import functools
 import hashlib
+import importlib
 import json
+import math
+import sys
 
-def hash_configuration(config: dict, method='sha256'):
+# faster non-cryptographic or SIMD accelerated hash functions from optional packages, imported on first use
+_EXTERNAL_METHODS = {
+    'blake3': ('blake3', 'blake3'),
+    'xxh3_128': ('xxhash', 'xxh3_128'),
+}
+
+# the hash only keys configurations, flagging it as not security related skips the FIPS checks of OpenSSL builds
+_HASHLIB_KWARGS = {'usedforsecurity': False} if sys.version_info >= (3, 9) else {}
+
+# json.dumps builds a new encoder per call when options are given, the default separators and ensure_ascii are kept as
+# changing them would change the hashes
+_JSON_ENCODE = json.JSONEncoder(sort_keys=True).encode
+
+
+def _has_non_finite(obj) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(k) or _has_non_finite(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(v) for v in obj)
+    return False
+
+
+# resolved once per method, the lookup and validation are not repeated for every hashed configuration
+@functools.lru_cache(maxsize=None)
+def _resolve(method):
+    if method in _EXTERNAL_METHODS:
+        module, name = _EXTERNAL_METHODS[method]
+        return getattr(importlib.import_module(module), name)
     if method not in hashlib.algorithms_available:
         raise ValueError(f"Hash method {method} not available."
-                         f"Available methods are {', '.join(hashlib.algorithms_available)}")
+                         f"Available methods are {', '.join([*hashlib.algorithms_available, *_EXTERNAL_METHODS])}")
+    if hasattr(hashlib, method):
+        return functools.partial(getattr(hashlib, method), **_HASHLIB_KWARGS)
+    # OpenSSL algorithms without a named constructor, e.g. sha512_256
+    return functools.partial(hashlib.new, method, **_HASHLIB_KWARGS)
+
 
-    hash_fnc = getattr(hashlib, method)
+def hash_configuration(config: dict, method='sha256', serializer='json'):
+    hash_fnc = _resolve(method)
 
-    # Serialize the dictionary into a JSON string
-    json_str = json.dumps(config, sort_keys=True)
+    # Serialize the dictionary into JSON, orjson is faster and returns bytes but its compact output yields different
+    # hashes than the default serializer
+    if serializer not in ('json', 'orjson'):
+        raise ValueError(f'Unknown serializer {serializer}. Use one of json, orjson.')
+    payload = None
+    # orjson writes NaN and infinities as null, which would give them the hash of None
+    if serializer == 'orjson' and not _has_non_finite(config):
+        import orjson
+        try:
+            payload = orjson.dumps(config, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str)
+        except TypeError:
+            # e.g. integers wider than 64 bit
+            pass
+    if payload is None:
+        payload = _JSON_ENCODE(config).encode()
 
     # Compute the hash of the JSON string
-    hash_object = hash_fnc(json_str.encode())
+    hash_object = hash_fnc(payload)
     hash = hash_object.hexdigest()
-    return hash
\ No newline at end of file
+    return hash
@@ -0,0 +1,196 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai4scr_data_utility.datasets import CacheMixIn, _serialize
+
+
+@pytest.fixture
+def cache(tmp_path):
+    class Cache(CacheMixIn):
+        cache_root = tmp_path
+
+    return Cache()
+
+
+def _magic(cache, fname, n=6):
+    with open(cache.get_cache_path(fname), 'rb') as f:
+        return f.read(n)
+
+
+def _assert_equal(loaded, data):
+    if isinstance(data, pd.DataFrame):
+        pd.testing.assert_frame_equal(loaded, data)
+    elif isinstance(data, np.ndarray):
+        np.testing.assert_array_equal(loaded, data)
+    elif isinstance(data, dict):
+        assert loaded.keys() == data.keys()
+        for k in data:
+            np.testing.assert_array_equal(loaded[k], data[k])
+    else:
+        assert loaded == data
+
+
+class FrameSubclass(pd.DataFrame):
+    @property
+    def _constructor(self):
+        return FrameSubclass
+
+
+@pytest.mark.parametrize('data, magic', [
+    (pd.DataFrame({'a': [1, 2, 3], 's': ['x', None, 'z']}), b'ARROW1'),
+    (np.arange(12, dtype=np.float32).reshape(3, 4), b'\x93NUMPY'),
+    ({'a': np.arange(3), 'b': np.ones((2, 2))}, b'PK\x03\x04'),
+    ({'a': np.arange(100_000), 'meta': 'x'}, b'AI4SCR'),
+    ([1, 'two', {'three': 3.0}], b'\x80\x05'),
+])
+def test_round_trip_formats(cache, data, magic):
+    cache.save_cache(data, 'f')
+    assert _magic(cache, 'f', len(magic)) == magic
+    _assert_equal(cache.load_cache('f'), data)
+
+
+def test_loaded_array_is_writable_without_touching_file(cache):
+    data = np.arange(10)
+    cache.save_cache(data, 'f')
+    loaded = cache.load_cache('f')
+    loaded[0] = 100
+    np.testing.assert_array_equal(cache.load_cache('f'), data)
+
+
+@pytest.mark.parametrize('data', [
+    pd.DataFrame({'a': [1, 'x', 2.0]}),
+    pd.DataFrame([[1, 2]], columns=['a', 'a']),
+    pd.DataFrame({0: [1, 2]}),
+    FrameSubclass({'a': [1, 2]}),
+])
+def test_frames_feather_cannot_keep_are_pickled(cache, data):
+    cache.save_cache(data, 'f')
+    assert _magic(cache, 'f', 6) != b'ARROW1'
+    loaded = cache.load_cache('f')
+    assert type(loaded) is type(data)
+    pd.testing.assert_frame_equal(loaded, data)
+
+
+def test_object_columns_are_not_converted(cache):
+    data = pd.DataFrame({'a': [{1, 2}, {3}]})
+    cache.save_cache(data, 'f')
+    assert cache.load_cache('f')['a'].tolist() == [{1, 2}, {3}]
+
+
+def test_masked_array_keeps_mask(cache):
+    data = np.ma.masked_array([1, 2, 3], mask=[0, 1, 0])
+    cache.save_cache(data, 'f')
+    loaded = cache.load_cache('f')
+    assert isinstance(loaded, np.ma.MaskedArray)
+    assert loaded.sum() == 4
+
+
+@pytest.mark.filterwarnings('ignore::PendingDeprecationWarning')
+def test_matrix_stays_matrix(cache):
+    data = np.matrix([[1, 2], [3, 4]])
+    cache.save_cache(data, 'f')
+    loaded = cache.load_cache('f')
+    assert type(loaded) is np.matrix
+    np.testing.assert_array_equal(loaded * loaded, data * data)
+
+
+@pytest.mark.parametrize('key', ['file', 'args', 'allow_pickle', 'not an identifier'])
+def test_reserved_npz_keys_are_pickled(cache, key):
+    data = {key: np.arange(3)}
+    cache.save_cache(data, 'f')
+    assert _magic(cache, 'f', 4) != b'PK\x03\x04'
+    np.testing.assert_array_equal(cache.load_cache('f')[key], data[key])
+
+
+def test_use_pickle(cache):
+    cache.use_pickle = True
+    data = pd.DataFrame({'a': [1, 2]})
+    cache.save_cache(data, 'f')
+    assert _magic(cache, 'f', 2) == b'\x80' + bytes([pickle.HIGHEST_PROTOCOL])
+    pd.testing.assert_frame_equal(cache.load_cache('f'), data)
+
+
+@pytest.mark.parametrize('data', [
+    pd.DataFrame({'a': np.arange(1000) % 7, 's': ['x'] * 1000}),
+    np.zeros(10_000),
+    {'a': np.arange(100_000), 'meta': 'x'},
+    [1, 2, 3],
+])
+def test_zstd_round_trip(cache, data):
+    pytest.importorskip('zstandard')
+    cache.compression = 'zstd'
+    cache.save_cache(data, 'f')
+    # DataFrames are stored as feather with compressed columns, everything else in a zstd frame
+    magic = b'ARROW1' if isinstance(data, pd.DataFrame) else b'\x28\xb5\x2f\xfd'
+    assert _magic(cache, 'f', len(magic)) == magic
+    _assert_equal(cache.load_cache('f'), data)
+
+
+@pytest.mark.parametrize('backend, module', [('joblib', 'joblib'), ('diskcache', 'diskcache')])
+def test_backends_round_trip(tmp_path, backend, module):
+    pytest.importorskip(module)
+
+    class BackendCache(CacheMixIn):
+        cache_root = tmp_path
+        cache_backend = backend
+
+    cache = BackendCache()
+    assert not cache.has_cache('f')
+    cache.save_cache({'a': np.arange(5)}, 'f')
+    assert cache.has_cache('f')
+    np.testing.assert_array_equal(cache.load_cache('f')['a'], np.arange(5))
+
+
+def test_invalid_configuration(tmp_path):
+    class Invalid(CacheMixIn):
+        cache_root = tmp_path
+        compression = 'gzip'
+
+    with pytest.raises(ValueError):
+        Invalid()
+
+
+def test_unchanged_content_is_not_rewritten(cache):
+    cache.save_cache([1, 2, 3], 'f')
+    path = cache.get_cache_path('f')
+    mtime = os.stat(path).st_mtime_ns
+    cache.save_cache([1, 2, 3], 'f')
+    assert os.stat(path).st_mtime_ns == mtime
+
+    cache.save_cache([1, 2, 4], 'f')
+    assert cache.load_cache('f') == [1, 2, 4]
+
+
+def test_truncated_file_is_rewritten(cache):
+    cache.save_cache(list(range(100)), 'f')
+    with open(cache.get_cache_path('f'), 'r+b') as f:
+        f.truncate(10)
+    cache.save_cache(list(range(100)), 'f')
+    assert cache.load_cache('f') == list(range(100))
+
+
+def test_file_replaced_by_other_backend_is_rewritten(cache):
+    pytest.importorskip('joblib')
+    cache.save_cache([1, 2, 3], 'f')
+    cache.cache_backend = 'joblib'
+    cache.save_cache({'other': 1}, 'f')
+    cache.cache_backend = 'file'
+    cache.save_cache([1, 2, 3], 'f')
+    assert cache.load_cache('f') == [1, 2, 3]
+
+
+def test_externally_deleted_cache_is_noticed(cache):
+    cache.save_cache([1], 'f')
+    assert cache.has_cache('f')
+    os.remove(cache.get_cache_path('f'))
+    assert not cache.has_cache('f')
+
+
+def test_serialize_returns_chunks():
+    chunks = _serialize({'a': np.arange(100_000), 'meta': 'x'})
+    assert len(chunks) > 1
+    assert all(memoryview(chunk).nbytes for chunk in chunks)
@@ -0,0 +1,118 @@
+import http.server
+import re
+import threading
+
+import pytest
+
+from ai4scr_data_utility import _download
+from ai4scr_data_utility._download import download_with_progress
+
+DATA = bytes(range(256)) * 4096  # 1 MiB
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """serves DATA
+
+    mode ``'ranges'`` answers range requests with 206, ``'none'`` does not support ranges and ``'ignored'`` advertises
+    range support but answers every request with the full file.
+    """
+    mode = 'ranges'
+    requests = None
+
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, status, length, content_range=None):
+        self.send_response(status)
+        if self.mode != 'none':
+            self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(length))
+        if content_range:
+            self.send_header('Content-Range', content_range)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers(200, len(DATA))
+
+    def do_GET(self):
+        if self.path != '/data':
+            self.send_error(404)
+            return
+        match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        self.requests.append(match.groups() if match else None)
+        if match and self.mode == 'ranges':
+            start, end = map(int, match.groups())
+            self._headers(206, end - start + 1, f'bytes {start}-{end}/{len(DATA)}')
+            self.wfile.write(DATA[start:end + 1])
+        else:
+            self._headers(200, len(DATA))
+            self.wfile.write(DATA)
+
+
+@pytest.fixture
+def server(request):
+    mode = getattr(request, 'param', 'ranges')
+    handler = type('Handler', (RangeHandler,), {'mode': mode, 'requests': []})
+    srv = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{srv.server_port}', handler.requests
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture(autouse=True)
+def small_multipart_threshold(monkeypatch):
+    monkeypatch.setattr(_download, '_MULTIPART_MIN_SIZE', 1024)
+
+
+def test_ranged_download(server, tmp_path):
+    url, requests = server
+    target = tmp_path / 'data'
+    download_with_progress(target, url + '/data', nparts=4, blocksize=1000)
+    assert target.read_bytes() == DATA
+    assert len(requests) == 4 and None not in requests
+    assert not (tmp_path / 'data.part').exists()
+
+
+@pytest.mark.parametrize('server', ['none'], indirect=True)
+def test_single_stream_without_range_support(server, tmp_path):
+    url, requests = server
+    target = tmp_path / 'data'
+    download_with_progress(target, url + '/data', nparts=4)
+    assert target.read_bytes() == DATA
+    assert requests == [None]
+
+
+@pytest.mark.parametrize('server', ['ignored'], indirect=True)
+def test_fallback_when_ranges_are_ignored(server, tmp_path):
+    url, requests = server
+    target = tmp_path / 'data'
+    download_with_progress(target, url + '/data', nparts=4)
+    assert target.read_bytes() == DATA
+    # the 200 responses to the range requests are rejected and the file is downloaded in one stream
+    assert requests[-1] is None
+
+
+def test_single_part(server, tmp_path):
+    url, requests = server
+    target = tmp_path / 'data'
+    download_with_progress(target, url + '/data', nparts=1)
+    assert target.read_bytes() == DATA
+    assert requests == [None]
+
+
+def test_failed_download_leaves_no_files(server, tmp_path):
+    url, _ = server
+    target = tmp_path / 'data'
+    with pytest.raises(Exception):
+        download_with_progress(target, url + '/missing', nparts=4)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_local_file(tmp_path):
+    src = tmp_path / 'src'
+    src.write_bytes(DATA)
+    target = tmp_path / 'data'
+    download_with_progress(target, src.as_uri())
+    assert target.read_bytes() == DATA